@@ -1,51 +1,58 @@
 #!/usr/bin/env python3
 import argparse
 import json
-import math
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List
 
 import pandas as pd
 
 
-def to_float_or_none(v) -> Optional[float]:
-    try:
-        x = float(v)
-        if math.isnan(x):
-            return None
-        return x
-    except Exception:
-        return None
+# Textspalten der CSV, die im JSON als (ggf. leere) Strings landen
+STR_COLS = ["Heim", "Gast", "Typ", "Liga", "Spielort_Name", "Straße", "Ort"]
 
 
-def to_int_or_none(v) -> Optional[int]:
-    try:
-        if pd.isna(v):
-            return None
-        return int(str(v).strip())
-    except Exception:
-        return None
+def build_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    # Spalten einmalig (vektorisiert) normalisieren statt pro Zeile
+    df = df.reindex(columns=["Datum", *STR_COLS, "PLZ", "Latitude", "Longitude"])
 
-
-def build_record(row: pd.Series) -> Dict[str, Any]:
     # Datum -> ISO 8601 ohne Zeitzone, z.B. "2025-08-01T18:00:00"
-    dt = pd.to_datetime(row.get("Datum"), errors="coerce")
-    spieldatum = dt.strftime("%Y-%m-%dT%H:%M:%S") if not pd.isna(dt) else None
-
-    rec = {
-        "Spieldatum": spieldatum,
-        "Heimmannschaft": (row.get("Heim") or "") if isinstance(row.get("Heim"), str) else str(row.get("Heim") or ""),
-        "Gastmannschaft": (row.get("Gast") or "") if isinstance(row.get("Gast"), str) else str(row.get("Gast") or ""),
-        "Typ": (row.get("Typ") or "") if isinstance(row.get("Typ"), str) else str(row.get("Typ") or ""),
-        "Liga": (row.get("Liga") or "") if isinstance(row.get("Liga"), str) else str(row.get("Liga") or ""),
-        "Spielort": (row.get("Spielort_Name") or "") if isinstance(row.get("Spielort_Name"), str) else str(row.get("Spielort_Name") or ""),
-        "Spielort Straße": (row.get("Straße") or "") if isinstance(row.get("Straße"), str) else str(row.get("Straße") or ""),
-        "Spielort PLZ": to_int_or_none(row.get("PLZ")),
-        "Spielort Ort": (row.get("Ort") or "") if isinstance(row.get("Ort"), str) else str(row.get("Ort") or ""),
-        "Latitude": to_float_or_none(row.get("Latitude")),
-        "Longitude": to_float_or_none(row.get("Longitude")),
-    }
-    return rec
+    # (main() hat bereits geparst; für datetime64-Spalten ist das kein erneutes Parsen)
+    dt = pd.to_datetime(df["Datum"], errors="coerce")
+    # numpy formatiert datetime64[s] direkt so – ohne strftime-Aufruf pro Wert
+    iso = dt.to_numpy().astype("datetime64[s]").astype(str).astype(object)
+    iso[dt.isna().to_numpy()] = None
+
+    df[STR_COLS] = df[STR_COLS].astype("string").fillna("")
+
+    # Zahlen spaltenweise umwandeln; NaN/NA -> None (JSON null)
+    plz = pd.to_numeric(df["PLZ"], errors="coerce")
+    num = pd.DataFrame({
+        "PLZ": plz.where(plz % 1 == 0).astype("Int64"),
+        "Latitude": pd.to_numeric(df["Latitude"], errors="coerce"),
+        "Longitude": pd.to_numeric(df["Longitude"], errors="coerce"),
+    })
+    df[list(num.columns)] = num.astype(object).where(num.notna(), None)
+
+    cols = [*STR_COLS, "PLZ", "Latitude", "Longitude"]
+    records: List[Dict[str, Any]] = []
+    append = records.append
+    # Jede Zelle genau einmal als Python-Objekt lesen (tolist) und an Locals binden
+    rows = zip(iso.tolist(), *[df[c].tolist() for c in cols])
+    for spieldatum, heim, gast, typ, liga, spielort, strasse, ort, plz, lat, lon in rows:
+        append({
+            "Spieldatum": spieldatum,
+            "Heimmannschaft": heim,
+            "Gastmannschaft": gast,
+            "Typ": typ,
+            "Liga": liga,
+            "Spielort": spielort,
+            "Spielort Straße": strasse,
+            "Spielort PLZ": plz,
+            "Spielort Ort": ort,
+            "Latitude": lat,
+            "Longitude": lon,
+        })
+    return records
 
 
 def main():
@@ -62,23 +69,27 @@ def main():
     if not os.path.exists(in_path):
         raise FileNotFoundError(f"Eingabe nicht gefunden: {in_path}")
 
-    # CSV laden (Semikolon, BOM-safe)
+    # CSV laden (Semikolon, BOM-safe). PLZ/Koordinaten ohne feste dtypes lesen: einzelne
+    # kaputte Zellen werden in build_records zu null statt den Lauf abzubrechen.
     df = pd.read_csv(in_path, sep=";", encoding="utf-8-sig")
 
     # Stabil sortieren: nach Datum (aufsteigend), dann Liga, Heim
     if "Datum" in df.columns:
-        df["Datum"] = pd.to_datetime(df["Datum"], errors="coerce")
+        # post_processing.py schreibt ISO-Datum ("2025-08-01 18:00:00"): festes Format statt
+        # Format-Erkennung; unparsebare Werte werden NaT (-> Spieldatum null)
+        df["Datum"] = pd.to_datetime(df["Datum"], format="ISO8601", errors="coerce")
         df = df.sort_values(["Datum", "Liga", "Heim"], na_position="last").reset_index(drop=True)
 
     # Records bauen
-    records: List[Dict[str, Any]] = [build_record(row) for _, row in df.iterrows()]
+    records = build_records(df)
 
     payload = {"martiballtermine_wien": records}
 
-    # Schreiben (schön formatiert, Umlaute erlauben)
+    # Schreiben (schön formatiert, Umlaute erlauben) – in einem Stück statt json.dump-Chunks
     os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    data = json.dumps(payload, ensure_ascii=False, indent=2)
     with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
+        f.write(data)
 
     print(f"[json] input:  {in_path}")
     print(f"[json] output: {out_path}")
@@ -112,18 +112,17 @@ def _solve_anubis_pow(random_data: str, difficulty: int) -> tuple[str, int]:
         nonce += 1
 
 
-async def _get_page_config(session: aiohttp.ClientSession, page_url: str) -> tuple[str, str, str]:
-    """Holt Proxy-Pfad und Project-OID aus einer Spielplan-Seite.
+async def fetch_page_html(session: aiohttp.ClientSession, page_url: str) -> tuple[str, str]:
+    """Lädt eine wfv.at-Seite und liefert (HTML, finale URL).
 
     Löst automatisch einen Anubis-Botschutz-Challenge (Proof-of-Work),
-    falls die Seite einen solchen liefert.
+    falls die Seite einen solchen liefert; das Cookie landet in der Session.
     """
-    spielplan_url = page_url.replace("/Bewerb/", "/Bewerb/Spielplan/", 1) if "/Spielplan/" not in page_url else page_url
-
     for attempt in range(2):
-        async with session.get(spielplan_url, timeout=aiohttp.ClientTimeout(total=_API_TIMEOUT)) as resp:
+        async with session.get(page_url, timeout=aiohttp.ClientTimeout(total=_API_TIMEOUT)) as resp:
             html = await resp.text()
-            resp_base = f"{resp.url.scheme}://{resp.url.host}"
+            final_url = str(resp.url)
+            resp_base = str(resp.url.origin())
 
         if "anubis_challenge" in html:
             if attempt > 0:
@@ -144,7 +143,7 @@ async def _get_page_config(session: aiohttp.ClientSession, page_url: str) -> tup
                 "id": challenge["id"],
                 "response": hash_hex,
                 "nonce": str(nonce),
-                "redir": spielplan_url,
+                "redir": page_url,
                 "elapsedTime": str(elapsed),
             })
             solve_url = f"{resp_base}/.within.website/x/cmd/anubis/api/pass-challenge?{params}"
@@ -153,6 +152,14 @@ async def _get_page_config(session: aiohttp.ClientSession, page_url: str) -> tup
             continue  # Seite erneut abrufen, jetzt mit Cookie
         break  # Keine Challenge – echte Seite erhalten
 
+    return html, final_url
+
+
+async def _get_page_config(session: aiohttp.ClientSession, page_url: str) -> tuple[str, str, str]:
+    """Holt Proxy-Pfad und Project-OID aus einer Spielplan-Seite."""
+    spielplan_url = page_url.replace("/Bewerb/", "/Bewerb/Spielplan/", 1) if "/Spielplan/" not in page_url else page_url
+    html, _ = await fetch_page_html(session, spielplan_url)
+
     parsed = urllib.parse.urlparse(spielplan_url)
     base_url = f"{parsed.scheme}://{parsed.netloc}"
 
@@ -177,13 +184,14 @@ def _build_api_url(base_url: str, proxy_path: str, project_oid: str, bewerb_id:
 def _extract_links_from_entries(entries: list) -> List[str]:
     """Extrahiert oefb.at-Spiellinks aus spiele/ergebnisse-Einträgen."""
     links: list[str] = []
+    append = links.append  # lokale Aliase für die innere Schleife
+    lower = str.lower
     for entry in entries:
         for link_obj in entry.get("links", []):
             link = link_obj.get("link", "")
-            if link and "/bewerbe/" in link.lower():
+            if link and "/bewerbe/" in lower(link):
                 # /Spielbericht/ => / normalisieren
-                link = link.replace("/Spielbericht/", "/")
-                links.append(link)
+                append(link.replace("/Spielbericht/", "/"))
     return links
 
 
@@ -204,7 +212,10 @@ async def _fetch_bewerb_links(
             try:
                 async with sem:
                     async with session.get(url, timeout=timeout, headers=_API_ACCEPT_HEADERS) as resp:
-                        return await resp.json(content_type=None)
+                        data = await resp.json(content_type=None)
+                    # Pause innerhalb des Semaphors: begrenzt die Request-Rate global
+                    await asyncio.sleep(_DELAY_BETWEEN)
+                    return data
             except Exception as e:
                 if attempt == _MAX_RETRIES:
                     print(f"[WARN] API-Fehler nach {_MAX_RETRIES} Versuchen für {bewerb_id}: {e}", file=sys.stderr)
@@ -221,15 +232,16 @@ async def _fetch_bewerb_links(
     all_links.extend(_extract_links_from_entries(data.get("spiele", [])))
     all_links.extend(_extract_links_from_entries(data.get("ergebnisse", [])))
 
-    # Verbleibende Runden sequenziell abrufen (schont den Server)
-    for runde_info in runden:
-        runde_nr = runde_info.get("runde", 0)
-        url = _build_api_url(base_url, proxy_path, project_oid, bewerb_id, runde_nr)
-        rdata = await fetch_json(url)
+    # Verbleibende Runden parallel abrufen; die Semaphore (inkl. Pause) schont
+    # den Server weiterhin, freie Slots werden aber auch am Ende des Laufs genutzt.
+    urls = [
+        _build_api_url(base_url, proxy_path, project_oid, bewerb_id, runde_info.get("runde", 0))
+        for runde_info in runden
+    ]
+    for rdata in await asyncio.gather(*(fetch_json(url) for url in urls)):
         if rdata:
             all_links.extend(_extract_links_from_entries(rdata.get("spiele", [])))
             all_links.extend(_extract_links_from_entries(rdata.get("ergebnisse", [])))
-        await asyncio.sleep(_DELAY_BETWEEN)
 
     # Deduplizieren, Reihenfolge beibehalten
     return list(dict.fromkeys(all_links))
@@ -277,7 +289,8 @@ async def scrape_all(
 
         total_new = 0
         with open(outfile, "a", newline="", encoding="utf-8") as fh:
-            writer = csv.writer(fh)
+            writerow = csv.writer(fh).writerow
+            seen_add = global_seen.add
 
             for i, result in enumerate(results, 1):
                 if isinstance(result, Exception):
@@ -291,8 +304,8 @@ async def scrape_all(
                 new_count = 0
                 for href in links:
                     if href not in global_seen:
-                        global_seen.add(href)
-                        writer.writerow((href, link, now_iso))
+                        seen_add(href)
+                        writerow((href, link, now_iso))
                         new_count += 1
 
                 total_new += new_count
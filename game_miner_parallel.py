@@ -1,4 +1,6 @@
+import csv
 import hashlib
+import multiprocessing
 import os
 import sys
 import json
@@ -7,8 +9,11 @@ import re
 import asyncio
 import argparse
 import urllib.parse
-from datetime import datetime, timezone
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
 from typing import Optional, List, Dict
+from zoneinfo import ZoneInfo
 
 import pandas as pd
 import aiohttp
@@ -39,7 +44,7 @@ async def _solve_anubis_for_session(
     Nach erfolgreicher Lösung enthält die Session ein Cookie, das für alle
     nachfolgenden Requests gegen dieselbe Domain gilt.
     """
-    async with session.get(test_url, timeout=aiohttp.ClientTimeout(total=20)) as resp:
+    async with session.get(test_url, timeout=_TIMEOUT) as resp:
         html = await resp.text()
         base = f"{resp.url.scheme}://{resp.url.host}"
 
@@ -68,7 +73,7 @@ async def _solve_anubis_for_session(
         "elapsedTime": str(elapsed),
     })
     solve_url = f"{base}/.within.website/x/cmd/anubis/api/pass-challenge?{params}"
-    async with session.get(solve_url, timeout=aiohttp.ClientTimeout(total=20)) as _:
+    async with session.get(solve_url, timeout=_TIMEOUT) as _:
         pass
 
 
@@ -81,6 +86,17 @@ _HEADERS = {
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
 }
 
+# Spalten der Ausgabe-CSV (Reihenfolge wie die Zeilen aus _parse_game)
+_COLUMNS = [
+    "Datum", "Liga", "Typ", "Runde", "Heim", "Gast", "Heim_Link", "Gast_Link",
+    "Spielort_Name", "Adresse", "Latitude", "Longitude", "Quelle", "link", "error",
+]
+
+_VIENNA = ZoneInfo("Europe/Vienna")
+
+# Einmal erzeugt und für alle Requests der Session wiederverwendet
+_TIMEOUT = aiohttp.ClientTimeout(total=20)
+
 _PRELOADS_RE = re.compile(
     r"SG\.container\.appPreloads\['[^']+'\]\s*=\s*(\[.*?\])\s*;",
     re.DOTALL,
@@ -146,12 +162,9 @@ def _epoch_ms_to_datetime(epoch_ms) -> Optional[str]:
     if not isinstance(epoch_ms, (int, float)):
         return None
     try:
-        dt = datetime.fromtimestamp(epoch_ms / 1000, tz=timezone.utc)
-        # oefb.at timestamps are CET/CEST; offset +1/+2
-        # Use a fixed +1h offset as a simple fallback (matches the original scraper behaviour
-        # which read local-time text from the page).
-        from zoneinfo import ZoneInfo
-        dt = dt.astimezone(ZoneInfo("Europe/Vienna"))
+        # oefb.at timestamps are CET/CEST; convert straight into local Vienna time
+        # (matches the original scraper behaviour which read local-time text from the page).
+        dt = datetime.fromtimestamp(epoch_ms / 1000, tz=_VIENNA)
         return dt.strftime("%Y-%m-%d %H:%M:%S")
     except (OSError, ValueError):
         return None
@@ -219,23 +232,34 @@ async def _fetch_and_parse(
     session: aiohttp.ClientSession,
     url: str,
     semaphore: asyncio.Semaphore,
+    pool: Optional[Executor] = None,
     retries: int = 4,
 ) -> Dict:
     """Lädt eine Spielseite per HTTP und parst die JSON-Daten.
 
     Enthält Retry-Logik: Wenn der CDN eine gekürzte Seite ohne Spieldaten
-    liefert, wird der Request mit Backoff wiederholt.
+    liefert, wird der Request mit Backoff wiederholt. Mit `pool` läuft das
+    (CPU-lastige) Parsen in einem Worker-Prozess statt im Event-Loop.
     """
+    loop = asyncio.get_running_loop()
     for attempt in range(1, retries + 1):
         try:
             async with semaphore:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=20)) as resp:
+                async with session.get(url, timeout=_TIMEOUT) as resp:
                     if resp.status != 200:
                         raise aiohttp.ClientError(f"HTTP {resp.status}")
                     html = await resp.text()
                 # Kleine Pause innerhalb des Semaphors, um Burst-Traffic zu vermeiden
                 await asyncio.sleep(0.15)
-            row = _parse_game(html, url)
+            if pool is None:
+                row = _parse_game(html, url)
+            else:
+                try:
+                    row = await loop.run_in_executor(pool, _parse_game, html, url)
+                except BrokenProcessPool:
+                    # Worker-Prozess gestorben (OOM, Segfault): der Pool nimmt keine Jobs mehr an,
+                    # das ist kein HTTP-Fehler → Seite im Event-Loop parsen statt Retries zu verbrauchen
+                    row = _parse_game(html, url)
             # Wenn Spieldaten fehlen (CDN hat gekürzte Seite geliefert) → retry
             if "error" in row and attempt < retries:
                 await asyncio.sleep(2.0 * attempt)
@@ -267,9 +291,43 @@ def load_links(input_csv: str) -> List[str]:
     return links
 
 
+def open_csv_writer(out_csv: str):
+    """Öffnet die Ausgabe-CSV zum Anhängen und liefert (Datei, DictWriter).
+
+    Neue/leere Dateien bekommen einen Header; bei bestehenden Dateien wird deren
+    Header übernommen, damit angehängte Zeilen dieselbe Spaltenfolge haben.
+    Fehlen darin Spalten aus _COLUMNS (z.B. "error", solange nie ein Fehler
+    auftrat), wird die Datei einmalig mit erweitertem Header neu geschrieben.
+    """
+    fieldnames = _COLUMNS
+    exists = os.path.exists(out_csv) and os.path.getsize(out_csv) > 0
+    if exists:
+        with open(out_csv, "r", newline="", encoding="utf-8-sig") as f:
+            rows = csv.reader(f, delimiter=";")
+            header = next(rows, None)
+            missing = [c for c in _COLUMNS if c not in (header or [])]
+            if header and missing:
+                # bestehende Zeilen bekommen die neuen Spalten leer (kürzere Zeilen reichen dafür)
+                tmp = out_csv + ".tmp"
+                with open(tmp, "w", newline="", encoding="utf-8-sig") as out:
+                    w = csv.writer(out, delimiter=";", lineterminator="\n")
+                    w.writerow(header + missing)
+                    w.writerows(rows)
+        if header and missing:
+            os.replace(tmp, out_csv)
+            header = header + missing
+        if header:
+            fieldnames = header
+    fh = open(out_csv, "a", newline="", encoding="utf-8-sig")
+    writer = csv.DictWriter(fh, fieldnames=fieldnames, delimiter=";",
+                            extrasaction="ignore", lineterminator="\n")
+    if not exists:
+        writer.writeheader()
+    return fh, writer
+
+
 async def _run_async(
     todo: List[str],
-    results: List[dict],
     have: set,
     links_all: List[str],
     out_csv: str,
@@ -277,30 +335,40 @@ async def _run_async(
     flush_every: int,
 ) -> None:
     semaphore = asyncio.Semaphore(max_workers)
-    connector = aiohttp.TCPConnector(limit=max_workers, limit_per_host=max_workers)
-    completed_since_flush = 0
-
-    def write_out():
-        pd.DataFrame(results).to_csv(out_csv, index=False, encoding="utf-8-sig", sep=";")
-        print(f"Zwischenspeicher: {len(results)} Einträge -> {out_csv}", flush=True)
-
-    async with aiohttp.ClientSession(headers=_HEADERS, connector=connector) as session:
-        # Einmalig Anubis-Challenge lösen (Cookie gilt für alle nachfolgenden Requests)
-        await _solve_anubis_for_session(session, todo[0])
+    # Keep-Alive-Verbindungen und DNS-Auflösung über alle Links hinweg wiederverwenden
+    # (praktisch nur ein Host: www.oefb.at)
+    connector = aiohttp.TCPConnector(limit=max_workers, limit_per_host=max_workers, ttl_dns_cache=None)
 
-        tasks = [_fetch_and_parse(session, url, semaphore) for url in todo]
-        for coro in asyncio.as_completed(tasks):
-            row = await coro
-            link = row.get("link", "")
-            results.append(row)
-            have.add(link)
-            completed_since_flush += 1
-            print(f"Fertig: {link}  ({len(have)}/{len(links_all)})", flush=True)
-            if completed_since_flush >= flush_every:
-                write_out()
-                completed_since_flush = 0
-
-    write_out()
+    # Neue Zeilen werden sofort angehängt statt die ganze CSV neu zu schreiben;
+    # auf Platte gespült wird nur alle `flush_every` Zeilen (und beim Schließen)
+    fh, writer = open_csv_writer(out_csv)
+    completed_since_flush = 0
+    # Regex-/JSON-Parsing auf mehrere Kerne verteilen; der Event-Loop bleibt frei für I/O.
+    # Worker starten erst beim ersten Job, wenn DNS-Resolver-/Pool-Threads schon laufen:
+    # daher nicht forken, sondern per forkserver (bzw. spawn unter Windows) starten.
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    pool = ProcessPoolExecutor(max_workers=min(max_workers, os.cpu_count() or 1),
+                               mp_context=multiprocessing.get_context(start_method))
+    try:
+        async with aiohttp.ClientSession(headers=_HEADERS, connector=connector) as session:
+            # Einmalig Anubis-Challenge lösen (Cookie gilt für alle nachfolgenden Requests)
+            await _solve_anubis_for_session(session, todo[0])
+
+            tasks = [_fetch_and_parse(session, url, semaphore, pool) for url in todo]
+            for coro in asyncio.as_completed(tasks):
+                row = await coro
+                link = row.get("link", "")
+                writer.writerow(row)
+                have.add(link)
+                completed_since_flush += 1
+                print(f"Fertig: {link}  ({len(have)}/{len(links_all)})", flush=True)
+                if completed_since_flush >= flush_every:
+                    fh.flush()
+                    completed_since_flush = 0
+                    print(f"Zwischenspeicher: {len(have)} Einträge -> {out_csv}", flush=True)
+    finally:
+        pool.shutdown(cancel_futures=True)
+        fh.close()
 
 
 def run_parallel(
@@ -314,26 +382,24 @@ def run_parallel(
     # 1) Links laden
     links_all = [l for l in load_links(input_csv) if "/Spielplan/" not in l]
 
-    # 2) Bereits vorhandene Ergebnisse laden/merken (Resume)
+    # 2) Bereits vorhandene Ergebnisse merken (Resume) – dafür reicht die Spalte 'link'
     if os.path.exists(out_csv):
-        df_existing = pd.read_csv(out_csv, encoding="utf-8-sig", sep=";")
+        df_existing = pd.read_csv(out_csv, encoding="utf-8-sig", sep=";", usecols=["link"])
         have = set(df_existing["link"].astype(str).tolist())
-        results = df_existing.to_dict("records")
     else:
         have = set()
-        results = []
 
     # 3) Übrig
     todo = [l for l in links_all if l not in have]
     if not todo:
         print("Alles erledigt – keine neuen Links.", flush=True)
         if not os.path.exists(out_csv):
-            pd.DataFrame(results).to_csv(out_csv, index=False, encoding="utf-8-sig", sep=";")
+            open_csv_writer(out_csv)[0].close()
         return
 
     print(f"Starte async: {len(todo)} Seiten, max_workers={max_workers}", flush=True)
-    asyncio.run(_run_async(todo, results, have, links_all, out_csv, max_workers, flush_every))
-    print(f"Fertig! Gesamt: {len(results)} Einträge -> {out_csv}", flush=True)
+    asyncio.run(_run_async(todo, have, links_all, out_csv, max_workers, flush_every))
+    print(f"Fertig! Gesamt: {len(have)} Einträge -> {out_csv}", flush=True)
 
 # ============== CLI ==============
 
@@ -9,40 +9,86 @@ Das Menü ist als verschachtelte <ul>/<li>-Struktur aufgebaut:
     - Liga:              <a href="/wfv/Bewerb/{ID}?{Name}"> z.B. "ADMIRAL BL - Meistergruppe"
 
 Die Menüeinträge befinden sich immer im DOM (CSS-hidden bei Nicht-Hover),
-daher reicht ein einziger Seitenaufruf + JavaScript-Extraktion.
+daher reicht ein einziger Seitenaufruf + JavaScript-Extraktion. Zuerst wird
+das HTML statisch per HTTP geholt (Anubis-Challenge wie in fminer.py gelöst)
+und geparst; Chrome wird nur gestartet, wenn dabei kein Menü gefunden wird.
 
 Ausgabe: CSV mit Spalten verband;bewerb;liga;link
 """
 
 import os
+import re
 import sys
 import csv
 import time
-import random
+import asyncio
 import argparse
 import contextlib
+import urllib.parse
+from html.parser import HTMLParser
 from pathlib import Path
-from typing import List, Set, Dict
+from typing import List, Optional, Set, Dict
 
+import aiohttp
 from selenium import webdriver
 from selenium.common.exceptions import (
     TimeoutException,
     WebDriverException,
-    NoSuchElementException,
-    ElementClickInterceptedException,
-    ElementNotInteractableException,
 )
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
 
+from fminer import fetch_page_html
+
 BASE_URL = "https://wfv.at/wfv/"
 VERBAND = "Wiener Fußballverband"
 
+_HTTP_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+    ),
+    "Accept-Language": "de-DE,de;q=0.9",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+}
+
 
 # ─── Driver Setup ────────────────────────────────────────────────────────────
 
+_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+]
+
+_DRIVER_PATH_CACHE = Path.home() / ".cache" / "fminer" / "chromedriver_path"
+
+
+def resolve_chromedriver_path(refresh: bool = False) -> str:
+    """Pfad zum chromedriver: $CHROMEDRIVER_PATH, sonst Cache-Datei, sonst
+    ChromeDriverManager().install() (Ergebnis wird für spätere Läufe gemerkt).
+
+    Mit `refresh=True` (vorheriger Start fehlgeschlagen) werden $CHROMEDRIVER_PATH
+    und Cache übersprungen und der Treiber direkt neu installiert."""
+    if not refresh:
+        env_path = os.environ.get("CHROMEDRIVER_PATH")
+        if env_path and os.path.isfile(env_path):
+            return env_path
+        with contextlib.suppress(OSError):
+            cached = _DRIVER_PATH_CACHE.read_text(encoding="utf-8").strip()
+            if cached and os.path.isfile(cached):
+                return cached
+    path = ChromeDriverManager().install()
+    with contextlib.suppress(OSError):
+        _DRIVER_PATH_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        _DRIVER_PATH_CACHE.write_text(path, encoding="utf-8")
+    return path
+
+
 def make_driver(headless: bool = True, page_load_timeout: int = 60) -> webdriver.Chrome:
     chrome_options = Options()
     chrome_bin = os.environ.get("CHROME_BIN") or os.environ.get("GOOGLE_CHROME_SHIM")
@@ -50,6 +96,8 @@ def make_driver(headless: bool = True, page_load_timeout: int = 60) -> webdriver
         chrome_options.binary_location = chrome_bin
     if headless:
         chrome_options.add_argument("--headless=new")
+    # get() kehrt bei DOMContentLoaded zurück; das Menü wird danach explizit abgewartet
+    chrome_options.page_load_strategy = "eager"
     chrome_options.add_argument("--disable-gpu")
     chrome_options.add_argument("--window-size=1920,1080")
     chrome_options.add_argument("--no-sandbox")
@@ -61,12 +109,29 @@ def make_driver(headless: bool = True, page_load_timeout: int = 60) -> webdriver
         "--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
         "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
     )
-    print("[INIT] Chrome WebDriver wird gestartet …")
-    driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
-        options=chrome_options,
+    # Bilder werden für die Menü-Extraktion nicht gebraucht
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    chrome_options.add_experimental_option(
+        "prefs", {"profile.managed_default_content_settings.images": 2}
     )
+    print("[INIT] Chrome WebDriver wird gestartet …")
+    try:
+        driver = webdriver.Chrome(
+            service=Service(resolve_chromedriver_path()),
+            options=chrome_options,
+        )
+    except WebDriverException:
+        # z.B. gecachter Treiber passt nach Chrome-Update nicht mehr → neu auflösen
+        print("[INIT] Start fehlgeschlagen, löse chromedriver neu auf …")
+        driver = webdriver.Chrome(
+            service=Service(resolve_chromedriver_path(refresh=True)),
+            options=chrome_options,
+        )
     driver.set_page_load_timeout(page_load_timeout)
+    # Bilder, Webfonts und Tracking gar nicht erst laden (CSS bleibt für den Cookie-Banner)
+    with contextlib.suppress(Exception):
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": _BLOCKED_URLS})
     print("[INIT] Chrome WebDriver bereit.")
     return driver
 
@@ -86,37 +151,39 @@ def safe_get(driver: webdriver.Chrome, url: str, attempts: int = 3) -> None:
             time.sleep(2 * i)
 
 
+_COOKIE_SELECTORS = [
+    "button#onetrust-accept-btn-handler",
+    "button.onetrust-close-btn-handler",
+    "button[title='Akzeptieren']",
+]
+
+# Sucht den Cookie-Button (Selektoren, sonst per Text) und klickt ihn direkt im
+# Browser – ein Roundtrip, ohne Selenium-Scroll/Sichtbarkeitsprüfung.
+# Rückgabe: "css", "text" oder null (kein Banner).
+_DISMISS_COOKIE_JS = """
+for (const sel of arguments[0]) {
+    const el = document.querySelector(sel);
+    if (el) { el.click(); return "css"; }
+}
+const btn = [...document.querySelectorAll('button')]
+    .find(b => b.textContent.includes(arguments[1]));
+if (btn) { btn.click(); return "text"; }
+return null;
+"""
+
+
 def dismiss_cookie_banner(driver: webdriver.Chrome) -> None:
     """Cookie-Banner akzeptieren, falls vorhanden."""
-    for sel in [
-        "button#onetrust-accept-btn-handler",
-        "button.onetrust-close-btn-handler",
-        "button[title='Akzeptieren']",
-    ]:
-        try:
-            btn = driver.find_element(By.CSS_SELECTOR, sel)
-            btn.click()
-            print("[COOKIE] Cookie-Banner geschlossen.")
-            time.sleep(1)
-            return
-        except (NoSuchElementException, ElementClickInterceptedException,
-                ElementNotInteractableException):
-            continue
-    # XPath-Fallback für wfv.at Cookie-Banner
     try:
-        btn = driver.find_element(
-            By.XPATH, "//button[contains(text(), 'Alle Cookies akzeptieren')]"
+        how = driver.execute_script(
+            _DISMISS_COOKIE_JS, _COOKIE_SELECTORS, "Alle Cookies akzeptieren"
         )
-        btn.click()
-        print("[COOKIE] Cookie-Banner geschlossen (XPath).")
+    except WebDriverException as e:
+        print(f"[WARN] Cookie-Banner: {e}", file=sys.stderr)
+        return
+    if how:
+        print(f"[COOKIE] Cookie-Banner geschlossen ({how}).")
         time.sleep(1)
-    except (NoSuchElementException, ElementClickInterceptedException,
-            ElementNotInteractableException):
-        pass
-
-
-def wait_short(lo: float = 0.5, hi: float = 1.5) -> None:
-    time.sleep(lo + random.random() * (hi - lo))
 
 
 # ─── Kern-Logik ──────────────────────────────────────────────────────────────
@@ -175,6 +242,28 @@ return results;
 """
 
 
+def collect_rows(menu_items: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Dedupliziert die Menü-Einträge und baut die CSV-Zeilen."""
+    rows: List[Dict[str, str]] = []
+    seen_links: Set[str] = set()
+
+    for item in menu_items:
+        link = item["href"]
+        if link in seen_links:
+            continue
+        seen_links.add(link)
+        row = {
+            "verband": VERBAND,
+            "bewerb": item["bewerb"],
+            "liga": item["liga"],
+            "link": link,
+        }
+        rows.append(row)
+        print(f"  [+] {item['bewerb']:30s} | {item['liga']} → {link}")
+
+    return rows
+
+
 def mine_spielplan_urls(
     driver: webdriver.Chrome,
     debug: bool = False,
@@ -186,14 +275,18 @@ def mine_spielplan_urls(
 
     Gibt Liste von Dicts zurück: [{verband, bewerb, liga, link}, ...]
     """
-    rows: List[Dict[str, str]] = []
-    seen_links: Set[str] = set()
-
     print(f"[NAV] Lade Startseite: {BASE_URL}")
     safe_get(driver, BASE_URL)
-    wait_short(3, 5)
+    # Weiter, sobald das Menü im DOM ist (statt pauschal 3–5 s zu warten);
+    # löst die Seite erst einen Bot-Challenge, wartet das bis zur echten Seite.
+    try:
+        WebDriverWait(driver, 30).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "a.has_drop"))
+        )
+    except TimeoutException:
+        print("[WARN] Menü nach 30 s nicht im DOM – versuche Extraktion trotzdem.",
+              file=sys.stderr)
     dismiss_cookie_banner(driver)
-    wait_short(1, 2)
 
     if debug and screenshot_dir:
         screenshot_dir.mkdir(parents=True, exist_ok=True)
@@ -208,22 +301,133 @@ def mine_spielplan_urls(
         return []
 
     print(f"[INFO] {len(menu_items)} Bewerb-Links extrahiert.\n")
+    return collect_rows(menu_items)
 
-    for item in menu_items:
-        link = item["href"]
-        if link in seen_links:
+
+# ─── Statischer Schnellpfad (ohne Browser) ──────────────────────────────────
+# Das Menü ist serverseitig gerendert; ein einfacher HTTP-Abruf genügt meist.
+# Der Browser wird nur gestartet, wenn hier nichts gefunden wird (z.B. wegen
+# eines Bot-Challenges oder geänderter Seitenstruktur).
+
+_VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+_BEWERB_HREF_RE = re.compile(r"/Bewerb/(Turniere/)?\d+")
+
+
+class _Node:
+    __slots__ = ("tag", "attrs", "children", "parent")
+
+    def __init__(self, tag: str, attrs: Dict[str, str], parent: Optional["_Node"]):
+        self.tag = tag
+        self.attrs = attrs
+        self.children: list = []  # _Node oder str
+        self.parent = parent
+
+    def text(self) -> str:
+        return "".join(c if isinstance(c, str) else c.text() for c in self.children)
+
+    def iter(self, tag: str):
+        for c in self.children:
+            if isinstance(c, _Node):
+                if c.tag == tag:
+                    yield c
+                yield from c.iter(tag)
+
+    def closest(self, tag: str) -> Optional["_Node"]:
+        node = self
+        while node is not None and node.tag != tag:
+            node = node.parent
+        return node
+
+
+class _TreeBuilder(HTMLParser):
+    """Minimaler DOM-Baum (nur was EXTRACT_MENU_JS braucht)."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = _Node("#root", {}, None)
+        self._cur = self.root
+
+    def handle_starttag(self, tag, attrs):
+        node = _Node(tag, {k: v or "" for k, v in attrs}, self._cur)
+        self._cur.children.append(node)
+        if tag not in _VOID_TAGS:
+            self._cur = node
+
+    def handle_startendtag(self, tag, attrs):
+        self._cur.children.append(_Node(tag, {k: v or "" for k, v in attrs}, self._cur))
+
+    def handle_endtag(self, tag):
+        node = self._cur.closest(tag)
+        if node is not None and node.parent is not None:
+            self._cur = node.parent
+
+    def handle_data(self, data):
+        self._cur.children.append(data)
+
+
+def extract_menu_static(html: str, base_url: str = BASE_URL) -> List[Dict[str, str]]:
+    """Python-Gegenstück zu EXTRACT_MENU_JS für bereits geladenes HTML."""
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+
+    menu_parent = None
+    for a in builder.root.iter("a"):
+        if a.text().strip() == "Ligen & Bewerbe":
+            menu_parent = a.closest("li")
+            break
+    if menu_parent is None:
+        return []
+
+    results: List[Dict[str, str]] = []
+    for cat_a in menu_parent.iter("a"):
+        if "has_drop" not in cat_a.attrs.get("class", "").split():
             continue
-        seen_links.add(link)
-        row = {
-            "verband": VERBAND,
-            "bewerb": item["bewerb"],
-            "liga": item["liga"],
-            "link": link,
-        }
-        rows.append(row)
-        print(f"  [+] {item['bewerb']:30s} | {item['liga']} → {link}")
+        bewerb = (cat_a.attrs.get("title") or cat_a.text() or "").strip()
+        parent_li = cat_a.closest("li")
+        if parent_li is None:
+            continue
+        for ul in parent_li.children:
+            if not isinstance(ul, _Node) or ul.tag != "ul":
+                continue
+            for a in ul.iter("a"):
+                raw_href = a.attrs.get("href", "")
+                if "/Bewerb/" not in raw_href:
+                    continue
+                href = urllib.parse.urljoin(base_url, raw_href)
+                if not _BEWERB_HREF_RE.search(href):
+                    continue
+                results.append({"bewerb": bewerb, "liga": a.text().strip(), "href": href})
+    return results
 
-    return rows
+
+async def _fetch_start_page() -> tuple[str, str]:
+    async with aiohttp.ClientSession(headers=_HTTP_HEADERS) as session:
+        return await fetch_page_html(session, BASE_URL)
+
+
+def mine_spielplan_urls_static() -> List[Dict[str, str]]:
+    """Holt die Startseite per HTTP (ohne Browser) und extrahiert das Menü.
+
+    Ein Anubis-Botschutz-Challenge wird wie in fminer.py per Proof-of-Work gelöst.
+    """
+    print(f"[HTTP] Lade Startseite statisch: {BASE_URL}")
+    try:
+        html, base_url = asyncio.run(_fetch_start_page())
+    except Exception as e:
+        print(f"[WARN] Statischer Abruf fehlgeschlagen: {e}", file=sys.stderr)
+        return []
+
+    menu_items = extract_menu_static(html, base_url)
+    if not menu_items:
+        print("[HTTP] Kein Menü im statischen HTML gefunden – verwende Browser.")
+        return []
+
+    print(f"[INFO] {len(menu_items)} Bewerb-Links extrahiert (statisch).\n")
+    return collect_rows(menu_items)
 
 
 # ─── Hauptprogramm ──────────────────────────────────────────────────────────
@@ -257,6 +461,11 @@ def main():
         action="store_true",
         help="Detailliertes Logging und Screenshots.",
     )
+    parser.add_argument(
+        "--browser",
+        action="store_true",
+        help="Statischen HTTP-Abruf überspringen und direkt den Browser verwenden.",
+    )
     parser.add_argument(
         "--screenshot-dir",
         default="screenshots",
@@ -264,18 +473,21 @@ def main():
     )
     args = parser.parse_args()
 
-    driver = make_driver(headless=not args.no_headless)
+    rows = [] if args.browser else mine_spielplan_urls_static()
 
-    try:
-        rows = mine_spielplan_urls(
-            driver,
-            debug=args.debug,
-            screenshot_dir=Path(args.screenshot_dir) if args.debug else None,
-        )
-    finally:
-        with contextlib.suppress(Exception):
-            driver.quit()
-            print("[EXIT] WebDriver beendet.")
+    if not rows:
+        driver = make_driver(headless=not args.no_headless)
+
+        try:
+            rows = mine_spielplan_urls(
+                driver,
+                debug=args.debug,
+                screenshot_dir=Path(args.screenshot_dir) if args.debug else None,
+            )
+        finally:
+            with contextlib.suppress(Exception):
+                driver.quit()
+                print("[EXIT] WebDriver beendet.")
 
     # Ergebnis ausgeben
     print(f"\n{'='*60}")
@@ -2,47 +2,74 @@ import argparse
 import os
 import re
 import sys
-from typing import Optional
 
+import numpy as np
 import pandas as pd
 
 
-def extract_address_parts(addr: Optional[str]) -> pd.Series:
-    """Extract Straße, PLZ, Ort from a free-form address string."""
-    if addr is None or (isinstance(addr, float) and pd.isna(addr)):
-        return pd.Series({"Straße": None, "PLZ": None, "Ort": None})
-    if not isinstance(addr, str):
-        addr = str(addr)
-
-    parts = [p.strip() for p in addr.split(",") if p.strip()]
-    street = parts[0] if parts else None
-
-    # prefer the second part (often "PLZ Ort"); fallback to full text (minus street)
-    plz_ort_source = parts[1] if len(parts) > 1 else (addr.replace(street, "", 1) if street else addr)
-
-    # 4–5 digit PLZ + city (no comma)
-    pat = r"\b(\d{4,5})\s+([A-Za-zÄÖÜäöüß\.\- ]+)\b"
-
-    m = re.search(pat, plz_ort_source)
-    if m:
-        plz = m.group(1).strip()
-        ort = m.group(2).strip()
-    else:
-        m2 = re.search(pat, addr)
-        if m2:
-            plz = m2.group(1).strip()
-            ort = m2.group(2).strip()
-        else:
-            plz, ort = None, None
-
-    return pd.Series({"Straße": street, "PLZ": plz, "Ort": ort})
-
-
-def ensure_columns(df: pd.DataFrame, cols):
-    for c in cols:
-        if c not in df.columns:
-            df[c] = pd.NA
-    return df
+# 4–5 digit PLZ + city (no comma)
+_PLZ_ORT_RE = re.compile(r"\b(\d{4,5})\s+([A-Za-zÄÖÜäöüß\.\- ]+)\b")
+# runs of commas (incl. surrounding whitespace) between address parts
+_PART_SEP_RE = re.compile(r"\s*(?:,\s*)+")
+
+# output columns (in order) of martiballtermine_wien.csv
+WANTED_COLS = [
+    "Datum", "Liga", "Typ", "Runde", "Heim", "Gast",
+    "Spielort_Name", "Straße", "PLZ", "Ort",
+    "Latitude", "Longitude", "Quelle"
+]
+# fixed coordinates per home club (take precedence over the geocoded ones)
+CLUB_COORDS = {
+    "Gersthofer SV": (48.225324870552456, 16.328420452719126),
+}
+# input columns actually needed (the rest, e.g. Heim_Link/Gast_Link/link, is never parsed)
+INPUT_COLS = {"Adresse", *WANTED_COLS}
+# explicit input dtypes (no type sniffing, no later astype copies); absent columns are ignored
+INPUT_DTYPES = {
+    "Liga": "category", "Typ": "category",
+    "Runde": "string", "Heim": "string", "Gast": "string",
+    "Spielort_Name": "string", "Adresse": "string", "Quelle": "string",
+}
+
+
+def extract_address_parts(addr: pd.Series) -> pd.DataFrame:
+    """Extract Straße, PLZ, Ort from free-form address strings (whole column at once)."""
+    # parse each distinct address once (a few hundred venues), broadcast back via the codes
+    codes, uniques = pd.factorize(addr)
+    text = pd.Series(uniques).astype("string")
+
+    # first two comma-separated parts (bounded split, only these two stripped)
+    parts = text.str.split(",", n=2, expand=True).reindex(columns=[0, 1]).astype("string")
+    parts[0] = parts[0].str.strip()
+    parts[1] = parts[1].str.strip()
+    # empty parts are dropped (e.g. "Str 1, , 1010 Wien"): re-split only those rows
+    empty = parts.eq("").any(axis=1)
+    if empty.any():
+        norm = text[empty].str.strip().str.replace(_PART_SEP_RE, ",", regex=True).str.strip(",")
+        parts.loc[empty] = norm.str.split(",", n=2, expand=True).reindex(columns=[0, 1]).astype("string")
+    street = parts[0].mask(parts[0] == "")
+
+    # prefer the second part (often "PLZ Ort"); fallback to the full text,
+    # scanned only for the rows where the second part has no match
+    plz_ort = parts[1].str.extract(_PLZ_ORT_RE)
+    miss = plz_ort[0].isna()
+    if miss.any():
+        plz_ort.loc[miss] = text[miss].str.extract(_PLZ_ORT_RE)
+
+    parsed = pd.DataFrame({
+        "Straße": street,
+        "PLZ": plz_ort[0],  # \d{4,5}, nothing to strip
+        "Ort": plz_ort[1].str.strip(),
+    })
+    # code -1 (missing address) is not in the index -> all-NA row
+    return parsed.reindex(codes).set_axis(addr.index)
+
+
+def rename_values(s: pd.Series, mapping: dict) -> pd.Series:
+    """Replace values via the (few) categories instead of scanning every row."""
+    # map on a categorical touches only the categories; unlike rename_categories it
+    # also copes with a mapping target that already exists as a category
+    return s.astype("category").map(lambda v: mapping.get(v, v))
 
 
 def main():
@@ -58,8 +85,6 @@ def main():
     args = p.parse_args()
 
     in_csv = args.in_csv
-    if not os.path.exists(in_csv):
-        raise FileNotFoundError(f"Input CSV not found: {in_csv}")
 
     out_dir = args.out_dir or "."
     os.makedirs(out_dir, exist_ok=True)
@@ -69,45 +94,62 @@ def main():
     fails_path = args.fails_file or os.path.join(out_dir, "fails.csv")
 
     # --- Load ---
-    df = pd.read_csv(in_csv, encoding="utf-8-sig", sep=";")
+    try:
+        df = pd.read_csv(in_csv, encoding="utf-8-sig", sep=";", usecols=lambda c: c in INPUT_COLS,
+                         dtype=INPUT_DTYPES)
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"Input CSV not found: {in_csv}") from e
 
     # --- Normalize fields used later ---
     # Map Bundesliga label + gender
     if "Liga" in df.columns:
-        df["Liga"] = df["Liga"].replace({"Österreichische Fußball-Bundesliga": "ADMIRAL Bundesliga"})
+        df["Liga"] = rename_values(df["Liga"], {"Österreichische Fußball-Bundesliga": "ADMIRAL Bundesliga"})
     if "Typ" in df.columns:
-        df["Typ"] = df["Typ"].replace({"Mann": "Männer", "Frau": "Frauen"})
+        df["Typ"] = rename_values(df["Typ"], {"Mann": "Männer", "Frau": "Frauen"})
 
     # --- Address parsing ---
     if "Adresse" not in df.columns:
-        df["Adresse"] = pd.NA
-    address_parts = df["Adresse"].apply(extract_address_parts)
-    df = pd.concat([df, address_parts], axis=1)
+        df["Adresse"] = pd.Series(pd.NA, index=df.index, dtype="string")
+    # prefilter: Ort is cut out of the address, so every Vienna row has 'wien' in Adresse;
+    # only those rows are parsed (substring test on the distinct addresses, mapped back via isin)
+    wien_adressen = [a for a in df["Adresse"].dropna().unique() if "wien" in a.lower()]
+    df_wien = df[df["Adresse"].isin(wien_adressen)]
+    # attach Straße/PLZ/Ort as new columns (no concat/realignment of the whole frame)
+    df_wien = df_wien.assign(**extract_address_parts(df_wien["Adresse"]))
 
     # --- Select only Vienna (Ort contains 'wien') ---
-    df["Ort"] = df["Ort"].astype("string")
-    df_wien = df[df["Ort"].str.contains("wien", case=False, na=False)].copy()
-
-    # --- Ensure required columns exist and order them ---
-    wanted_cols = [
-        "Datum", "Liga", "Typ", "Runde", "Heim", "Gast",
-        "Spielort_Name", "Straße", "PLZ", "Ort",
-        "Latitude", "Longitude", "Quelle"
-    ]
-    df_wien = ensure_columns(df_wien, wanted_cols)
-    df_out = df_wien[wanted_cols].copy()
+    # plain substring test on the (~100) distinct Ort values, then map back via isin
+    wien_orte = [o for o in df_wien["Ort"].dropna().unique() if "wien" in o.lower()]
+    mask_wien = df_wien["Ort"].isin(wien_orte)
+
+    # --- Take Vienna rows + output columns in one go, then order them (missing ones added as NaN) ---
+    df_out = df_wien.loc[mask_wien, df_wien.columns.intersection(WANTED_COLS)].reindex(columns=WANTED_COLS)
+
+    # --- Coordinates: numeric only for the Vienna rows; a malformed cell becomes NaN instead of aborting ---
+    df_out["Latitude"] = pd.to_numeric(df_out["Latitude"], errors="coerce")
+    df_out["Longitude"] = pd.to_numeric(df_out["Longitude"], errors="coerce")
 
     # --- Datetime, sort ---
-    df_out["Datum"] = pd.to_datetime(df_out["Datum"], errors="coerce")
-    df_out = df_out.sort_values("Datum")
+    # parsed here rather than via parse_dates: only the Vienna rows, and a missing Datum column stays NaT
+    dt = pd.to_datetime(df_out["Datum"], errors="coerce", format="ISO8601")
+    # stable argsort on the int64 view; NaT (= INT64_MIN) sorts first, rotate it to the end
+    order = np.argsort(dt.values.view("i8"), kind="stable")
+    order = np.roll(order, -int(dt.isna().sum()))
+    df_out = df_out.iloc[order].copy()
+    df_out["Datum"] = dt.to_numpy()[order]
 
     # --- Korrekturen ---
-    mask_gersthof = df_out["Heim"] == "Gersthofer SV"
-    if mask_gersthof.any():
-        df_out.loc[mask_gersthof, ["Latitude", "Longitude"]] = [48.225324870552456, 16.328420452719126]
+    # one left join against CLUB_COORDS instead of one mask assignment per club
+    fix = pd.DataFrame.from_dict(CLUB_COORDS, orient="index", columns=["Latitude_fix", "Longitude_fix"])
+    df_out = df_out.merge(fix, left_on="Heim", right_index=True, how="left")
+    df_out["Latitude"] = df_out["Latitude_fix"].fillna(df_out["Latitude"])
+    df_out["Longitude"] = df_out["Longitude_fix"].fillna(df_out["Longitude"])
+    df_out = df_out.drop(columns=["Latitude_fix", "Longitude_fix"])
 
     # --- Fails (missing coords) ---
-    df_nan = df_out[df_out["Latitude"].isna() & df_out["Longitude"].isna()].copy()
+    lat = df_out["Latitude"].to_numpy(dtype="float64", na_value=np.nan)
+    lon = df_out["Longitude"].to_numpy(dtype="float64", na_value=np.nan)
+    df_nan = df_out.iloc[np.flatnonzero(np.isnan(lat) & np.isnan(lon))]
     # keep fails CSV even if empty for debugging consistency
     df_nan.to_csv(fails_path, sep=";", index=False, encoding="utf-8-sig")
 